@@ -59,12 +59,34 @@ If using Python < 3.7, the import should look like this instead:
 
 """
 
-from more_itertools import collapse
+import functools
+import keyword
+from types import GeneratorType, MappingProxyType
 
 from .funcs import func
 from .units import unit
 from .utils import classes, fonts, rule, styles
 
+# Tags are deliberately left out, so "from htbuilder import *" doesn't clobber
+# names like html, time or select in the importing module.
+__all__ = [
+    "EMPTY_ELEMENTS",
+    "H",
+    "HtmlElement",
+    "HtmlTag",
+    "Placeholder",
+    "classes",
+    "fonts",
+    "fragment",
+    "func",
+    "funcs",
+    "rule",
+    "styles",
+    "unit",
+    "units",
+    "utils",
+]
+
 EMPTY_ELEMENTS = set(
     [
         # https://developer.mozilla.org/en-US/docs/Glossary/Empty_element
@@ -93,101 +115,506 @@ EMPTY_ELEMENTS = set(
     ]
 )
 
+# Tags created eagerly at import time, so that "from htbuilder import div" is a
+# plain global lookup rather than a call into the module's __getattr__. The
+# object and set tags are left to __getattr__, since globals with those names
+# would shadow the builtins this module uses.
+_STD_TAGS = (
+    # HTML
+    "a", "abbr", "address", "area", "article", "aside", "audio", "b", "base",
+    "bdi", "bdo", "blockquote", "body", "br", "button", "canvas", "caption",
+    "cite", "code", "col", "colgroup", "data", "datalist", "dd", "details",
+    "dfn", "dialog", "div", "dl", "dt", "em", "embed", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+    "h6", "head", "header", "hgroup", "hr", "html", "i", "iframe", "img",
+    "input", "ins", "kbd", "label", "legend", "li", "link", "main", "map",
+    "mark", "menu", "meta", "meter", "nav", "noscript", "ol", "optgroup",
+    "option", "output", "p", "param", "picture", "pre", "progress", "q", "rp",
+    "rt", "ruby", "s", "samp", "script", "section", "select", "slot", "small",
+    "source", "span", "strong", "style", "sub", "summary", "sup", "table",
+    "tbody", "td", "template", "textarea", "tfoot", "th", "thead", "time",
+    "title", "tr", "track", "u", "ul", "var", "video", "wbr",
+    # SVG
+    "circle", "clipPath", "defs", "ellipse", "g", "image", "line",
+    "linearGradient", "mask", "path", "pattern", "polygon", "polyline",
+    "radialGradient", "rect", "stop", "svg", "symbol", "text", "tspan", "use",
+)
+
 
 class _ElementCreator(object):
     def __getattr__(self, tag):
-        return HtmlTag(tag)
+        return _get_tag(tag)
 
 
 class HtmlTag(object):
+    __slots__ = (
+        "_tag",
+        "_clean",
+        "_is_empty",
+        "_open_noattr",
+        "_open_prefix",
+        "_open_suffix",
+        "_close",
+        "__weakref__",
+    )
+
     def __init__(self, tag):
         """HTML element builder."""
-        self._tag = tag
+        self._tag = tag.lower()
+        self._clean = _clean_name(self._tag)
+        self._is_empty = tag in EMPTY_ELEMENTS
+
+        # Pre-built fragments, so rendering only appends existing strings.
+        # An element without attributes is written as _open_noattr, and one
+        # with attributes as _open_prefix, the attributes, then _open_suffix.
+        clean = self._clean
+        self._open_prefix = f"<{clean} "
+        if self._is_empty:
+            self._open_noattr = f"<{clean}/>"
+            self._open_suffix = "/>"
+            self._close = ""
+        else:
+            self._open_noattr = f"<{clean}>"
+            self._open_suffix = ">"
+            self._close = f"</{clean}>"
 
     def __call__(self, *args, **kwargs):
         if args and kwargs:
             raise ValueError("Accept args or kwargs in element, but not both.")
 
-        return HtmlElement(self._tag)(*args, **kwargs)
+        return HtmlElement(self)(*args, **kwargs)
 
 
+_set_slot = object.__setattr__
 
-VOIDED_CHILDREN = (None, False, True)
+# Set to True to HTML-escape attribute values (&, <, > and ") when rendering.
+SAFE_ATTRS = False
+
+_ATTR_VALUE_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+)
 
 
 class HtmlElement(object):
-    def __init__(self, tag, attrs={}, children=[]):
+    __slots__ = (
+        "_tag",
+        "_attrs",
+        "_children",
+        "_is_empty",
+        "_attrs_str",
+        "_attrs_simple",
+        "_attrs_safe",
+        "_tag_obj",
+        "__weakref__",
+    )
+
+    def __init__(self, tag, attrs=None, children=None):
         """An HTML element."""
-        self._tag = tag.lower()
-        self._attrs = attrs
-        self._children = children
-        self._is_empty = tag in EMPTY_ELEMENTS
+        if not isinstance(tag, HtmlTag):
+            tag = HtmlTag(tag)
+        # Internal state is set through _set_slot, skipping __setattr__,
+        # which is only meant for HTML attributes.
+        _set_slot(self, "_tag_obj", tag)
+        _set_slot(self, "_tag", tag._tag)
+        # Attribute names are stored already cleaned (e.g. "class_" is stored
+        # as "class"), so rendering doesn't have to clean them every time.
+        if attrs is None:
+            attrs = {}
+        else:
+            attrs = {_clean_name(k): v for k, v in attrs.items()}
+        _set_slot(self, "_attrs", attrs)
+        _set_slot(self, "_children", [] if children is None else list(children))
+        _set_slot(self, "_is_empty", tag._is_empty)
+        # Serialized attributes, or None if they need to be rebuilt.
+        _set_slot(self, "_attrs_str", None)
+        # The SAFE_ATTRS value _attrs_str was built with.
+        _set_slot(self, "_attrs_safe", False)
+        # Whether no attribute value is None, True or False.
+        _set_slot(self, "_attrs_simple", _are_simple_values(attrs.values()))
 
     def __call__(self, *children, **attrs):
         if children:
             if self._is_empty:
                 raise TypeError("<%s> cannot have children" % self._tag)
-            self._children = list(collapse([*self._children, *children]))
+            _flatten(children, self._children)
 
         if attrs:
-            self._attrs = {**self._attrs, **attrs}
+            own_attrs = self._attrs
+            for k, v in attrs.items():
+                own_attrs[_clean_name(k)] = v
+            _set_slot(self, "_attrs_str", None)
+            if self._attrs_simple and not _are_simple_values(attrs.values()):
+                _set_slot(self, "_attrs_simple", False)
 
         return self
 
+    @property
+    def attrs(self):
+        """A read-only view of the HTML attributes.
+
+        Keys are cleaned attribute names, like "class" or "data-foo". Use
+        set_attr() and del_attr(), or call the element with keyword args, to
+        change them.
+        """
+        return MappingProxyType(self._attrs)
+
+    def set_attr(self, name, value):
+        """Set the HTML attribute name to value."""
+        self._attrs[_clean_name(name)] = value
+        _set_slot(self, "_attrs_str", None)
+        if value is None or value is True or value is False:
+            _set_slot(self, "_attrs_simple", False)
+
+    def del_attr(self, name):
+        """Remove the HTML attribute name."""
+        del self._attrs[_clean_name(name)]
+        _set_slot(self, "_attrs_str", None)
+
     def __getattr__(self, name):
-        if name in self._attrs:
-            return self._attrs[name]
+        # HTML attribute names can't start with an underscore. This also fails
+        # fast on protocol probes like __deepcopy__ or __html__.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attrs = self._attrs
+        key = _clean_name(name)
+        if key in attrs:
+            return attrs[key]
         raise AttributeError("No such attribute %s" % name)
 
     def __setattr__(self, name, value):
         if name.startswith("_"):
-            object.__setattr__(self, name, value)
-            return
-        self._attrs[name] = value
+            _set_slot(self, name, value)
+        elif hasattr(type(self), name):
+            # Names like attrs or compile belong to the element's API, and
+            # silently turning them into HTML attributes would be confusing.
+            raise AttributeError("Can't set %s; use set_attr() instead" % name)
+        else:
+            self.set_attr(name, value)
 
     def __delattr__(self, name):
-        del self._attrs[name]
+        if name.startswith("_"):
+            object.__delattr__(self, name)
+        elif hasattr(type(self), name):
+            raise AttributeError("Can't delete %s; use del_attr() instead" % name)
+        else:
+            self.del_attr(name)
 
     def __str__(self):
-        html = self._get_html_template() % {
-            "tag": _clean_name(self._tag),
-            "attrs": _serialize_attrs(self._attrs),
-            "children": _render_children(self._children),
+        if _render_c is not None:
+            return _render_c(self)
+
+        parts = []
+        self._write(parts)
+        return "".join(parts)
+
+    def compile(self, placeholders):
+        """Compile this element into a function that renders it.
+
+        Attribute values and children set to Placeholder(name) become the
+        arguments of the returned function, in the order given by
+        placeholders. Everything else is rendered once, right now, so the
+        element shouldn't be modified afterwards. This includes the current
+        SAFE_ATTRS setting, which later changes to the flag don't affect.
+
+        Example
+        -------
+
+        >>> row = li(class_=Placeholder("cls"))(Placeholder("text"))
+        >>> render_row = row.compile(["cls", "text"])
+        >>> render_row("odd", "hello")
+        '<li class="odd">hello</li>'
+
+        """
+        placeholders = list(placeholders)
+
+        for name in placeholders:
+            if (
+                not isinstance(name, str)
+                or not name.isidentifier()
+                or keyword.iskeyword(name)
+                or name.startswith("_")
+            ):
+                raise ValueError("Invalid placeholder name %r" % name)
+
+        if len(set(placeholders)) != len(placeholders):
+            raise ValueError("Placeholder names must be unique.")
+
+        pieces = []
+        _compile_element(self, pieces)
+
+        exprs = []
+        for piece in pieces:
+            if isinstance(piece, str):
+                if exprs and isinstance(exprs[-1], str):
+                    exprs[-1] += piece
+                else:
+                    exprs.append(piece)
+            elif piece.name not in placeholders:
+                raise ValueError("Unknown placeholder %r" % piece.name)
+            else:
+                exprs.append(piece)
+
+        body = " + ".join(
+            repr(e) if isinstance(e, str) else e._expr for e in exprs
+        )
+        src = "def _render(%s):\n    return %s\n" % (
+            ", ".join(placeholders),
+            body,
+        )
+
+        # The generated code only calls these underscore-prefixed helpers, so
+        # placeholder names (which can't start with "_") never shadow them.
+        namespace = {
+            "_render_slot": _render_slot,
+            "_render_attr_slot": _render_attr_slot,
         }
+        exec(compile(src, "<htbuilder>", "exec"), namespace)
+        return namespace["_render"]
 
-        if self._tag == "html":
-            return "<!DOCTYPE html>%(html)s" % {"html": html}
+    def stream(self, write):
+        """Render this element piece by piece, passing each piece to write.
 
-        return html
+        This never builds the whole HTML string. write is called with str
+        fragments, several per element and often only a few characters long,
+        so it should be a buffered text writer: a file opened in text mode,
+        an io.StringIO, or an io.TextIOWrapper around a binary stream. It
+        shouldn't be something like socket.sendall, which needs bytes.
 
-    def _get_html_template(self) -> str:
-        if self._is_empty:
-            return "<%(tag)s %(attrs)s/>" if self._attrs else "<%(tag)s/>"
+        Example
+        -------
+
+        >>> import sys
+        >>> div(id="container")("hello").stream(sys.stdout.write)
+        <div id="container">hello</div>
+
+        """
+        _write_children((self,), write)
+
+    def _write(self, parts):
+        """Append this element's HTML fragments to the list parts."""
+        _write_children((self,), parts.append)
+
+
+class Placeholder(object):
+    def __init__(self, name):
+        """A named slot, filled in when calling a compiled HtmlElement."""
+        self.name = name
+
+    def __repr__(self):
+        return "Placeholder(%r)" % self.name
+
+
+class _Slot(object):
+    def __init__(self, name, expr):
+        self.name = name
+        self._expr = expr
+
+
+def _render_slot(value):
+    """Render a value passed for a child Placeholder, as __call__ would."""
+    children = []
+    _flatten((value,), children)
+    return _render_children(children)
 
-        return (
-            "<%(tag)s %(attrs)s>%(children)s</%(tag)s>"
-            if self._attrs
-            else "<%(tag)s>%(children)s</%(tag)s>"
-        )
+
+def _render_attr_slot(name, value, escape):
+    """Render a value passed for an attribute Placeholder.
+
+    Like _serialize_attrs, None and False drop the attribute and True renders
+    just its name. The result includes the leading space.
+    """
+    if value is None or value is False:
+        return ""
+    if value is True:
+        return " " + name
+    if escape:
+        return f' {name}="{_escape_attr_value(value)}"'
+    return f' {name}="{value}"'
+
+
+def _compile_element(elem, pieces):
+    """Like _write_children, but emits _Slots for Placeholders.
+
+    Uses the same explicit stack as _write_children, holding children still to
+    be compiled and the closing tags of open elements.
+    """
+    stack = [elem]
+
+    while stack:
+        c = stack.pop()
+
+        if c is None or c is False or c is True:
+            continue
+
+        if isinstance(c, Placeholder):
+            pieces.append(_Slot(c.name, "_render_slot(%s)" % c.name))
+            continue
+
+        if not isinstance(c, HtmlElement):
+            pieces.append(str(c))
+            continue
+
+        if c._tag == "html":
+            pieces.append("<!DOCTYPE html>")
+
+        tag = c._tag_obj
+
+        # Each attribute is written with a leading space, since whether a slot
+        # renders anything is only known when the compiled function is called.
+        pieces.append(f"<{tag._clean}")
+
+        for k, v in c._attrs.items():
+            if isinstance(v, Placeholder):
+                expr = "_render_attr_slot(%r, %s, %r)" % (k, v.name, SAFE_ATTRS)
+                pieces.append(_Slot(v.name, expr))
+            else:
+                pieces.append(_render_attr_slot(k, v, SAFE_ATTRS))
+
+        pieces.append(tag._open_suffix)
+
+        if not c._is_empty:
+            stack.append(tag._close)
+            stack.extend(reversed(c._children))
+
+
+def _flatten(items, out):
+    """Append the leaves of arbitrarily nested iterables in items to out.
+
+    Strings, bytes and HTML elements are treated as leaves, like
+    more_itertools.collapse does.
+    """
+    stack = [iter(items)]
+
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, (list, tuple, range, GeneratorType)):
+                stack.append(iter(item))
+                break
+
+            if isinstance(item, (str, bytes, HtmlElement, int, float)):
+                out.append(item)
+                continue
+
+            try:
+                it = iter(item)
+            except TypeError:
+                out.append(item)
+                continue
+
+            stack.append(it)
+            break
+        else:
+            stack.pop()
+
+
+def _write_children(children, write):
+    """Pass the HTML fragments for children, in order, to write.
+
+    The tree is walked with an explicit stack rather than by recursion, so
+    deeply nested elements can't hit Python's recursion limit. The stack holds
+    children still to be written and the closing tags of open elements.
+    """
+    stack = list(children)
+    stack.reverse()
+    push = stack.append
+    pop = stack.pop
+    # Cached attribute strings built under a different SAFE_ATTRS are stale.
+    safe = bool(SAFE_ATTRS)
+
+    while stack:
+        c = pop()
+        t = type(c)
+
+        # Plain strings, which include the closing tags, are the common case.
+        if t is str:
+            write(c)
+            continue
+
+        if t is not HtmlElement and not isinstance(c, HtmlElement):
+            # None, True and False children aren't rendered.
+            if c is not None and t is not bool:
+                write(str(c))
+            continue
+
+        if c._tag == "html":
+            write("<!DOCTYPE html>")
+
+        tag = c._tag_obj
+        attrs_str = c._attrs_str
+        if attrs_str is None or c._attrs_safe is not safe:
+            attrs = c._attrs
+            attrs_str = _serialize_attrs(attrs, c._attrs_simple) if attrs else ""
+            _set_slot(c, "_attrs_str", attrs_str)
+            _set_slot(c, "_attrs_safe", safe)
+
+        if attrs_str:
+            write(tag._open_prefix)
+            write(attrs_str)
+            write(tag._open_suffix)
+        else:
+            write(tag._open_noattr)
+
+        if not c._is_empty:
+            push(tag._close)
+            stack.extend(reversed(c._children))
 
 
 def _render_children(children):
-    return "".join(
-        [str(c) for c in children if all(c is not uc for uc in VOIDED_CHILDREN)]
-    )
+    if _render_children_c is not None:
+        return _render_children_c(children)
+
+    parts = []
+    _write_children(children, parts.append)
+    return "".join(parts)
+
+
+def _are_simple_values(values):
+    for v in values:
+        if v is None or v is True or v is False:
+            return False
+    return True
+
+
+def _serialize_attrs(attrs, simple=False):
+    """Serialize HTML attributes, whose names are already cleaned, to a string.
+
+    If simple is True, the caller guarantees no value is None, True or False.
+    """
+    # The compiled serializer is faster at every dict size, even counting the
+    # extra call (measured from 1 to 32 attributes).
+    if _serialize_attrs_c is not None:
+        return _serialize_attrs_c(attrs, simple)
+
+    if SAFE_ATTRS:
+        return " ".join(
+            [
+                f'{k}="{_escape_attr_value(v)}"' if v is not True else k
+                for k, v in attrs.items()
+                if (v is not None and v is not False)
+            ]
+        )
 
+    if simple:
+        return " ".join([f'{k}="{v}"' for k, v in attrs.items()])
 
-def _serialize_attrs(attrs):
-    """Serialize HTML attributes to a string."""
     return " ".join(
         [
-            f'{_clean_name(k)}="{v}"' if v is not True else _clean_name(k)
+            f'{k}="{v}"' if v is not True else k
             for k, v in attrs.items()
             if (v is not None and v is not False)
         ]
     )
 
 
+_UNDERSCORES_TO_DASHES = str.maketrans({"_": "-"})
+
+
+def _escape_attr_value(v):
+    return str(v).translate(_ATTR_VALUE_ESCAPES)
+
+
+# Tag and attribute names come from a small set, so this is nearly always a hit.
+@functools.lru_cache(maxsize=2048)
 def _clean_name(k: str) -> str:
     # This allows you to use reserved words by appending an underscore as a suffix.
     # For example, use "class_" instead of "class". If an underscore prefix is provided,
@@ -197,17 +624,46 @@ def _clean_name(k: str) -> str:
             "Underscore prefix for reserved words not supported, use suffix instead."
         )
 
-    return k.rstrip("_").replace("_", "-")
+    return k.rstrip("_").translate(_UNDERSCORES_TO_DASHES)
 
 
 def fragment(*args):
     return _render_children(args)
 
 
+# Use the compiled render path when it was built (see _render.pyx).
+try:
+    from ._render import render as _render_c
+    from ._render import render_children as _render_children_c
+    from ._render import serialize_attrs as _serialize_attrs_c
+except ImportError:
+    _render_c = None
+    _render_children_c = None
+    _serialize_attrs_c = None
+
+
+# HtmlTags are immutable, so a single instance per tag name can be shared.
+_TAG_CACHE = {}
+
+
+def _get_tag(tag):
+    t = _TAG_CACHE.get(tag)
+    if t is None:
+        # Tags can't start with an underscore, and this keeps probes like
+        # hasattr(htbuilder, "__wrapped__") working.
+        if tag.startswith("_"):
+            raise AttributeError(tag)
+        t = _TAG_CACHE[tag] = HtmlTag(tag)
+    return t
+
+
+globals().update({t: _get_tag(t) for t in _STD_TAGS})
+
+
 # Python >= 3.7
 # https://docs.python.org/3/reference/datamodel.html#customizing-module-attribute-access
 def __getattr__(tag):
-    return HtmlTag(tag)
+    return _get_tag(tag)
 
 
 # For Python < 3.7
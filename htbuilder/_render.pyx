@@ -0,0 +1,116 @@
+# cython: language_level=3
+# Copyright 2020 Thiago Teixeira
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compiled version of htbuilder's render path.
+
+This mirrors _write_children and friends in htbuilder/__init__.py, and
+must be kept in sync with them. It's optional: when it isn't built,
+htbuilder falls back to the pure-Python implementation.
+"""
+
+import htbuilder
+from htbuilder import HtmlElement, _ATTR_VALUE_ESCAPES
+
+
+cpdef str serialize_attrs(dict attrs, bint simple=False):
+    """Serialize HTML attributes, whose names are already cleaned, to a string.
+
+    If simple is True, the caller guarantees no value is None, True or False.
+    """
+    cdef list out = []
+
+    if htbuilder.SAFE_ATTRS:
+        for k, v in attrs.items():
+            if v is None or v is False:
+                continue
+            if v is True:
+                out.append(k)
+            else:
+                out.append(f'{k}="{str(v).translate(_ATTR_VALUE_ESCAPES)}"')
+        return " ".join(out)
+
+    if simple:
+        for k, v in attrs.items():
+            out.append(f'{k}="{v}"')
+        return " ".join(out)
+
+    for k, v in attrs.items():
+        if v is None or v is False:
+            continue
+        if v is True:
+            out.append(k)
+        else:
+            out.append(f'{k}="{v}"')
+
+    return " ".join(out)
+
+
+cdef void write_children(object children, list parts) except *:
+    # Walks the tree with an explicit stack, like _write_children in
+    # __init__.py. The stack holds children still to be written and the
+    # closing tags of open elements.
+    cdef list stack = list(children)
+    cdef object attrs_str
+    cdef object safe = bool(htbuilder.SAFE_ATTRS)
+
+    stack.reverse()
+
+    while stack:
+        c = stack.pop()
+        t = type(c)
+
+        if t is str:
+            parts.append(c)
+            continue
+
+        if t is not HtmlElement and not isinstance(c, HtmlElement):
+            if c is not None and t is not bool:
+                parts.append(str(c))
+            continue
+
+        if c._tag == "html":
+            parts.append("<!DOCTYPE html>")
+
+        tag = c._tag_obj
+        attrs_str = c._attrs_str
+        if attrs_str is None or c._attrs_safe is not safe:
+            attrs_str = serialize_attrs(c._attrs, c._attrs_simple) if c._attrs else ""
+            object.__setattr__(c, "_attrs_str", attrs_str)
+            object.__setattr__(c, "_attrs_safe", safe)
+
+        if attrs_str:
+            parts.append(tag._open_prefix)
+            parts.append(attrs_str)
+            parts.append(tag._open_suffix)
+        else:
+            parts.append(tag._open_noattr)
+
+        if not c._is_empty:
+            stack.append(tag._close)
+            stack.extend(reversed(c._children))
+
+
+cpdef str render(object elem):
+    """Render an HtmlElement to a string."""
+    cdef list parts = []
+    write_children((elem,), parts)
+    return "".join(parts)
+
+
+cpdef str render_children(object children):
+    """Render a sequence of children to a string."""
+    cdef list parts = []
+    write_children(children, parts)
+    return "".join(parts)
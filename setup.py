@@ -1,5 +1,21 @@
 import setuptools
 
+# The compiled render path is optional. Without Cython (or a C compiler)
+# htbuilder installs as pure Python.
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [
+            setuptools.Extension(
+                "htbuilder._render", ["htbuilder/_render.pyx"], optional=True
+            )
+        ],
+        language_level=3,
+    )
+
 with open("README.md", "r", encoding="utf8") as fh:
     long_description = fh.read()
 
@@ -14,7 +30,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/tvst/htbuilder",
     packages=setuptools.find_packages(exclude=["tests", "tests.*"]),
-    install_requires=["more-itertools"],
+    ext_modules=ext_modules,
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
@@ -12,9 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import unittest
+import weakref
+
+import htbuilder
 
 from htbuilder import div, ul, li, img, h1, script, fragment, my_custom_element, my_custom_element_
+from htbuilder import _clean_name, HtmlElement, Placeholder
 from htbuilder.funcs import rgba
 from htbuilder.units import px, em, percent
 from htbuilder.utils import styles
@@ -157,8 +162,9 @@ class TestHtBuilder(unittest.TestCase):
         )
 
     def test_underscore_prefix_raises_value_error(self):
+        # Attribute names are cleaned when set, so this raises right away.
         with self.assertRaises(ValueError):
-            str(h1(_class="bad-heading"))
+            h1(_class="bad-heading")
 
 
     def test_funcs_in_builder(self):
@@ -230,6 +236,52 @@ class TestHtBuilder(unittest.TestCase):
             getattr(dom, "boz")
 
 
+    def test_set_del_attr_methods(self):
+        dom = div(foo="bar")
+        self.assertEqual(str(dom), '<div foo="bar"></div>')
+
+        dom.set_attr("boz", "boink")
+        self.assertEqual(str(dom), '<div foo="bar" boz="boink"></div>')
+
+        dom.del_attr("foo")
+        self.assertEqual(str(dom), '<div boz="boink"></div>')
+
+    def test_attrs_is_a_read_only_live_view(self):
+        dom = div(foo="a", class_="x")
+        attrs = dom.attrs
+        self.assertEqual(dict(attrs), {"foo": "a", "class": "x"})
+        self.assertEqual(str(dom), '<div foo="a" class="x"></div>')
+
+        with self.assertRaises(TypeError):
+            attrs["foo"] = "b"
+        self.assertEqual(str(dom), '<div foo="a" class="x"></div>')
+
+        dom.set_attr("foo", "b")
+        self.assertEqual(attrs["foo"], "b")
+        self.assertEqual(str(dom), '<div foo="b" class="x"></div>')
+
+    def test_setting_api_names_raises(self):
+        dom = div(foo="bar")
+        with self.assertRaises(AttributeError):
+            dom.attrs = {"x": 1}
+        with self.assertRaises(AttributeError):
+            del dom.attrs
+        with self.assertRaises(AttributeError):
+            dom.compile = "x"
+        self.assertEqual(str(dom), '<div foo="bar"></div>')
+
+    def test_get_set_del_attr_with_underscores(self):
+        dom = div(class_="foo", data_bar="baz")
+
+        self.assertEqual(dom.class_, "foo")
+        self.assertEqual(dom.data_bar, "baz")
+
+        dom.class_ = "boink"
+        self.assertEqual(str(dom), '<div class="boink" data-bar="baz"></div>')
+
+        del dom.data_bar
+        self.assertEqual(str(dom), '<div class="boink"></div>')
+
     def test_no_such_attr(self):
         dom = div()
         res = hasattr(dom, "foo")
@@ -259,6 +311,24 @@ class TestHtBuilder(unittest.TestCase):
             <div foo-bar="boz"></div>
         '''))
 
+    def test_clean_name_is_stable_across_calls(self):
+        for _ in range(2):
+            self.assertEqual(_clean_name("class_"), "class")
+            self.assertEqual(_clean_name("foo_bar__"), "foo-bar")
+            self.assertEqual(_clean_name("my_custom_element_"), "my-custom-element")
+            with self.assertRaises(ValueError):
+                _clean_name("_class")
+
+    def test_many_attrs(self):
+        attrs = {"a%s" % i: str(i) for i in range(10)}
+        attrs.update(foo_bar="baz", t=True, f=False, n=None)
+        dom = div(**attrs)
+        self.assertEqual(
+            str(dom),
+            "<div %s foo-bar=\"baz\" t></div>"
+            % " ".join('a%s="%s"' % (i, i) for i in range(10)),
+        )
+
     def test_attr_empty_string_is_rendered(self):
         dom = div(foo="")
         self.assertEqual(
@@ -273,6 +343,10 @@ class TestHtBuilder(unittest.TestCase):
             normalize_whitespace("""<div bar="baz"></div>"""),
         )
 
+    def test_no_space_if_no_attr_is_rendered(self):
+        self.assertEqual(str(div(foo=None)), "<div></div>")
+        self.assertEqual(str(img(foo=False)), "<img/>")
+
     def test_attr_is_not_rendered_if_value_is_False(self):
         dom = div(foo=False, bar="baz")
         self.assertEqual(
@@ -287,6 +361,47 @@ class TestHtBuilder(unittest.TestCase):
             normalize_whitespace("""<div foo bar="baz"></div>"""),
         )
 
+    def test_attr_set_to_bool_or_none_after_render(self):
+        dom = div(foo="bar", bar="baz")
+        self.assertEqual(str(dom), '<div foo="bar" bar="baz"></div>')
+
+        dom(foo=True)
+        self.assertEqual(str(dom), '<div foo bar="baz"></div>')
+
+        dom.bar = None
+        self.assertEqual(str(dom), '<div foo></div>')
+
+    def test_attr_values_are_not_escaped_by_default(self):
+        dom = div(title='a "b" & <c>')
+        self.assertEqual(str(dom), '<div title="a "b" & <c>"></div>')
+
+    def test_attr_values_are_escaped_with_safe_attrs(self):
+        htbuilder.SAFE_ATTRS = True
+        self.addCleanup(setattr, htbuilder, "SAFE_ATTRS", False)
+
+        dom = div(title='a "b" & <c>', hidden=True, foo=None)
+        self.assertEqual(
+            str(dom),
+            '<div title="a &quot;b&quot; &amp; &lt;c&gt;" hidden></div>',
+        )
+
+        render = div(title=Placeholder("title"), id='"x"').compile(["title"])
+        self.assertEqual(
+            render("<y>"),
+            '<div title="&lt;y&gt;" id="&quot;x&quot;"></div>',
+        )
+
+    def test_safe_attrs_applies_to_already_rendered_elements(self):
+        self.addCleanup(setattr, htbuilder, "SAFE_ATTRS", False)
+        dom = div(div(title="<x>"))
+        self.assertEqual(str(dom), '<div><div title="<x>"></div></div>')
+
+        htbuilder.SAFE_ATTRS = True
+        self.assertEqual(str(dom), '<div><div title="&lt;x&gt;"></div></div>')
+
+        htbuilder.SAFE_ATTRS = False
+        self.assertEqual(str(dom), '<div><div title="<x>"></div></div>')
+
     def test_both_children_and_attrs_raises(self):
         self.assertRaises(ValueError, lambda: div("hello", foo="bar"))
 
@@ -299,6 +414,141 @@ class TestHtBuilder(unittest.TestCase):
             <div foo="bar">hello</div>
         '''))
 
+    def test_repeat_after_attr_change(self):
+        dom = div(foo="bar")("hello")
+        self.assertEqual(str(dom), '<div foo="bar">hello</div>')
+
+        dom.foo = "baz"
+        self.assertEqual(str(dom), '<div foo="baz">hello</div>')
+
+        dom(boz="boink")
+        self.assertEqual(str(dom), '<div foo="baz" boz="boink">hello</div>')
+
+        del dom.foo
+        self.assertEqual(str(dom), '<div boz="boink">hello</div>')
+
+    def test_compile(self):
+        dom = div(id="container")(
+            ul(
+                li(class_=Placeholder("cls"), hidden=True)(Placeholder("text")),
+                li("static", None),
+            )
+        )
+        render = dom.compile(["cls", "text"])
+        self.assertEqual(render("odd", "hello"), normalize_whitespace('''
+            <div id="container">
+                <ul>
+                    <li class="odd" hidden>hello</li>
+                    <li>static</li>
+                </ul>
+            </div>
+        '''))
+        self.assertEqual(
+            render(cls="even", text=[h1("hi"), None]),
+            '<div id="container"><ul><li class="even" hidden><h1>hi</h1></li>'
+            '<li>static</li></ul></div>',
+        )
+
+    def test_compile_without_placeholders(self):
+        dom = div(foo="bar")("hello")
+        self.assertEqual(dom.compile([])(), str(dom))
+
+    def test_compile_placeholder_named_like_a_builtin(self):
+        render = div(title=Placeholder("str"))(Placeholder("len")).compile(
+            ["str", "len"]
+        )
+        self.assertEqual(render("x", "y"), '<div title="x">y</div>')
+
+    def test_compile_attr_placeholders_follow_attr_rules(self):
+        dom = li(class_=Placeholder("c"), hidden=Placeholder("h"))
+        render = dom.compile(["c", "h"])
+
+        self.assertEqual(render(None, True), "<li hidden></li>")
+        self.assertEqual(render(False, None), "<li></li>")
+        self.assertEqual(render("odd", False), '<li class="odd"></li>')
+        for c, h in [(None, True), (False, None), ("odd", False)]:
+            self.assertEqual(render(c, h), str(li(class_=c, hidden=h)))
+
+        render = img(src=Placeholder("src")).compile(["src"])
+        self.assertEqual(render(None), "<img/>")
+        self.assertEqual(render("foo"), '<img src="foo"/>')
+
+    def test_compile_bad_placeholders_raise(self):
+        dom = div(Placeholder("text"))
+        with self.assertRaises(ValueError):
+            dom.compile([])
+        with self.assertRaises(ValueError):
+            dom.compile(["text", "text"])
+        with self.assertRaises(ValueError):
+            dom.compile(["text", "not valid"])
+        with self.assertRaises(ValueError):
+            dom.compile(["text", 1])
+
+    def test_children_argument_is_not_mutated(self):
+        children = ["a"]
+        dom = HtmlElement("div", children=children)("b")
+        self.assertEqual(str(dom), "<div>ab</div>")
+        self.assertEqual(children, ["a"])
+
+    def test_elements_and_tags_support_weak_references(self):
+        dom = div("hello")
+        self.assertIs(weakref.ref(dom)(), dom)
+        self.assertIs(weakref.ref(div)(), div)
+
+        cache = weakref.WeakKeyDictionary()
+        cache[dom] = "rendered"
+        self.assertEqual(cache[dom], "rendered")
+
+    def test_star_import_does_not_export_tags(self):
+        namespace = {}
+        exec("from htbuilder import *", namespace)
+        self.assertIn("fragment", namespace)
+        self.assertIn("styles", namespace)
+        self.assertNotIn("div", namespace)
+        self.assertNotIn("html", namespace)
+        self.assertNotIn("time", namespace)
+
+    def test_tags_named_like_builtins(self):
+        self.assertIsInstance(vars(htbuilder)["input"], htbuilder.HtmlTag)
+        self.assertIsInstance(vars(htbuilder)["map"], htbuilder.HtmlTag)
+        self.assertNotIn("object", vars(htbuilder))
+        self.assertNotIn("set", vars(htbuilder))
+        self.assertEqual(str(htbuilder.set(to="red")), '<set to="red"></set>')
+
+    def test_deeply_nested_tree(self):
+        depth = 5000
+        dom = div("x")
+        for _ in range(depth - 1):
+            dom = div(dom)
+        self.assertEqual(str(dom), "<div>" * depth + "x" + "</div>" * depth)
+
+    def test_compile_deeply_nested_tree(self):
+        depth = 5000
+        dom = div(Placeholder("text"))
+        for _ in range(depth - 1):
+            dom = div(dom)
+        render = dom.compile(["text"])
+        self.assertEqual(render("x"), "<div>" * depth + "x" + "</div>" * depth)
+
+    def test_stream(self):
+        dom = div(id="container")(
+            h1("Examples"),
+            None,
+            ul(li("Example 1"), li("Example 2")),
+            img(src="foo"),
+        )
+        out = io.StringIO()
+        dom.stream(out.write)
+        self.assertEqual(out.getvalue(), str(dom))
+
+    def test_children_of_various_types(self):
+        class Shout(str):
+            def __str__(self):
+                return self.upper()
+
+        dom = div("a", 0, 1.5, Shout("b"), b"c", h1("d"))
+        self.assertEqual(str(dom), "<div>a01.5Bb'c'<h1>d</h1></div>")
+
     def test_voided_children_are_not_rendered(self):
         dom = div("hello", None, " ", False, "world", True, "!")
         self.assertEqual(str(dom), "<div>hello world!</div>")
@@ -0,0 +1,92 @@
+# Copyright 2020 Thiago Teixeira
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+import htbuilder
+from htbuilder import div, ul, li, img, h1, html, body, span, my_custom_element
+
+try:
+    from htbuilder import _render
+except ImportError:
+    _render = None
+
+
+def build_trees():
+    # Built fresh for each render path, since elements cache their attributes.
+    return [
+        div(),
+        div("hello", None, " ", False, "world", True, 0, 1.5),
+        img(src="foo", alt='a "b" & <c>'),
+        img(foo=None),
+        div(foo=None, bar=False, baz=True, boz="")("x"),
+        html(body(div(id="container", class_="foo bar")(h1("Examples")))),
+        ul(li(data_index=i)("Example %s" % i) for i in range(5)),
+        my_custom_element(foo_bar__="baz")(span(), "text"),
+        div(**{"a%s" % i: i for i in range(20)}, t=True, n=None),
+    ]
+
+
+def build_attr_dicts():
+    return [
+        {},
+        {"id": "x"},
+        {"foo": None, "bar": False, "baz": True, "boz": ""},
+        {"title": 'a "b" & <c>', "n": 1},
+        {"a%s" % i: i for i in range(20)},
+    ]
+
+
+@unittest.skipIf(_render is None, "compiled render module isn't built")
+class TestCompiledRenderMatchesPython(unittest.TestCase):
+    """Checks _render.pyx against the pure-Python render path."""
+
+    def setUp(self):
+        # Force everything in htbuilder/__init__.py onto the Python path.
+        for name in ("_render_c", "_render_children_c", "_serialize_attrs_c"):
+            patcher = mock.patch.object(htbuilder, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assert_paths_match(self):
+        for py_tree, c_tree in zip(build_trees(), build_trees()):
+            expected = str(py_tree)
+            self.assertEqual(_render.render(c_tree), expected)
+
+        expected = htbuilder._render_children(build_trees())
+        self.assertEqual(_render.render_children(build_trees()), expected)
+
+        for attrs in build_attr_dicts():
+            simple = htbuilder._are_simple_values(attrs.values())
+            self.assertEqual(
+                _render.serialize_attrs(attrs, simple),
+                htbuilder._serialize_attrs(attrs, simple),
+            )
+            self.assertEqual(
+                _render.serialize_attrs(attrs),
+                htbuilder._serialize_attrs(attrs),
+            )
+
+    def test_render_matches_python(self):
+        self.assert_paths_match()
+
+    def test_render_matches_python_with_safe_attrs(self):
+        htbuilder.SAFE_ATTRS = True
+        self.addCleanup(setattr, htbuilder, "SAFE_ATTRS", False)
+        self.assert_paths_match()
+
+
+if __name__ == "__main__":
+    unittest.main()